@@ -1,10 +1,14 @@
 import requests
-import json
-import pytz
-from datetime import datetime, date, timedelta
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, timedelta, timezone
 from enum import Enum
-import itertools
-from typing import TypedDict, Optional, Tuple
+from typing import ClassVar, Iterable, NamedTuple, Optional, Tuple
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 
 class WeatherSymbol(Enum):
@@ -42,10 +46,13 @@ class WeatherSymbol(Enum):
 
     @classmethod
     def from_code(cls, code: int):
-        for symbol in cls:
-            if symbol.code == code:
-                return symbol
-        raise ValueError(f"No matching weather symbol for code: {code}")
+        try:
+            return cls._BY_CODE[code]
+        except KeyError:
+            raise ValueError(f"No matching weather symbol for code: {code}") from None
+
+
+WeatherSymbol._BY_CODE = {symbol.code: symbol for symbol in WeatherSymbol}
 
 
 class PCAT(Enum):
@@ -63,172 +70,137 @@ class PCAT(Enum):
     FREEZING_RAIN = 5
     FREEZING_DRIZZLE = 6
 
-
-class WeatherValueFloat(TypedDict):
-    value: Optional[float]
-    unit: str
-
-
-class WeatherValueInt(TypedDict):
-    value: Optional[int]
-    unit: str
-
-
-class WeatherValuePCAT(TypedDict):
-    value: Optional[PCAT]
-    unit: str
-
-
-class WeatherValueWeatherSymbol(TypedDict):
-    value: Optional[WeatherSymbol]
-    unit: str
-
-
-class WeatherDataEntry(TypedDict):
-    msl: WeatherValueFloat  # Air pressure
-    t: WeatherValueFloat  # Air temperature
-    vis: WeatherValueFloat  # Horizontal visibility
-    wd: WeatherValueInt  # Wind direction
-    ws: WeatherValueFloat  # Wind speed
-    r: WeatherValueInt  # Relative humidity
-    tstm: WeatherValueInt  # Thunder probability
-    tcc_mean: WeatherValueInt  # Mean value of total cloud cover
-    lcc_mean: WeatherValueInt  # Lean value of low level cloud cover
-    mcc_mean: WeatherValueInt  # Mean value of medium level cloud cover
-    hcc_mean: WeatherValueInt  # Mean value of high level cloud cover
-    gust: WeatherValueFloat  # Wind gust speed
-    pmin: WeatherValueFloat  # Minimum precipitation intensity
-    pmax: WeatherValueFloat  # Maximum precipitation intensity
-    spp: WeatherValueInt  # Percent of precipitation in frozen form
-    pcat: WeatherValuePCAT  # Precipitation category
-    pmean: WeatherValueFloat  # Mean precipitation intensity
-    pmedian: WeatherValueFloat  # Median precipitation intensity
-    Wsymb2: WeatherValueWeatherSymbol  # Weather symbol
+    @classmethod
+    def from_value(cls, value: int):
+        try:
+            return cls._value2member_map_[value]
+        except KeyError:
+            raise ValueError(f"{value!r} is not a valid {cls.__name__}") from None
+
+
+class WeatherDataEntry(NamedTuple):
+    msl: Optional[float]  # Air pressure
+    t: Optional[float]  # Air temperature
+    vis: Optional[float]  # Horizontal visibility
+    wd: Optional[int]  # Wind direction
+    ws: Optional[float]  # Wind speed
+    r: Optional[int]  # Relative humidity
+    tstm: Optional[int]  # Thunder probability
+    tcc_mean: Optional[int]  # Mean value of total cloud cover
+    lcc_mean: Optional[int]  # Lean value of low level cloud cover
+    mcc_mean: Optional[int]  # Mean value of medium level cloud cover
+    hcc_mean: Optional[int]  # Mean value of high level cloud cover
+    gust: Optional[float]  # Wind gust speed
+    pmin: Optional[float]  # Minimum precipitation intensity
+    pmax: Optional[float]  # Maximum precipitation intensity
+    spp: Optional[int]  # Percent of precipitation in frozen form
+    pcat: Optional[PCAT]  # Precipitation category
+    pmean: Optional[float]  # Mean precipitation intensity
+    pmedian: Optional[float]  # Median precipitation intensity
+    Wsymb2: Optional[WeatherSymbol]  # Weather symbol
+
+
+_PARAM_NAMES = WeatherDataEntry._fields
+
+# Units are the same for every entry in a forecast, so they are stored once
+# per parameter name, filled in from the first parsed entry.
+UNITS: dict[str, str] = {}
 
 
 def date_str_to_datetime(date_str: str) -> datetime:
-    datetime_object = datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%SZ")
-    return datetime_object.replace(tzinfo=pytz.UTC)
+    # Fixed-width "YYYY-MM-DDTHH:MM:SSZ"; slicing is much cheaper than strptime
+    if len(date_str) != 20 or date_str[19] != "Z":
+        raise ValueError(f"Unexpected validTime format: {date_str!r}")
+    return datetime(
+        int(date_str[0:4]),
+        int(date_str[5:7]),
+        int(date_str[8:10]),
+        int(date_str[11:13]),
+        int(date_str[14:16]),
+        int(date_str[17:19]),
+        tzinfo=timezone.utc,
+    )
 
 
 def SMHI_timeSeries_object_to_WeatherDataEntry(
     obj: str,
 ) -> Tuple[datetime, WeatherDataEntry]:
     valid_time = date_str_to_datetime(obj["validTime"])
-    data_dict = {
-        item["name"]: {"value": item["values"][0], "unit": item["unit"]}
-        for item in obj["parameters"]
-    }
-    return valid_time, WeatherDataEntry(
-        {
-            "msl": {
-                "value": data_dict.get("msl")["value"],
-                "unit": data_dict.get("msl")["unit"],
-            },
-            "t": {
-                "value": data_dict.get("t")["value"],
-                "unit": data_dict.get("t")["unit"],
-            },
-            "vis": {
-                "value": data_dict.get("vis")["value"],
-                "unit": data_dict.get("vis")["unit"],
-            },
-            "wd": {
-                "value": data_dict.get("wd")["value"],
-                "unit": data_dict.get("wd")["unit"],
-            },
-            "ws": {
-                "value": data_dict.get("ws")["value"],
-                "unit": data_dict.get("ws")["unit"],
-            },
-            "r": {
-                "value": data_dict.get("r")["value"],
-                "unit": data_dict.get("r")["unit"],
-            },
-            "tstm": {
-                "value": data_dict.get("tstm")["value"],
-                "unit": data_dict.get("tstm")["unit"],
-            },
-            "tcc_mean": {
-                "value": data_dict.get("tcc_mean")["value"],
-                "unit": data_dict.get("tcc_mean")["unit"],
-            },
-            "lcc_mean": {
-                "value": data_dict.get("lcc_mean")["value"],
-                "unit": data_dict.get("lcc_mean")["unit"],
-            },
-            "mcc_mean": {
-                "value": data_dict.get("mcc_mean")["value"],
-                "unit": data_dict.get("mcc_mean")["unit"],
-            },
-            "hcc_mean": {
-                "value": data_dict.get("hcc_mean")["value"],
-                "unit": data_dict.get("hcc_mean")["unit"],
-            },
-            "gust": {
-                "value": data_dict.get("gust")["value"],
-                "unit": data_dict.get("gust")["unit"],
-            },
-            "pmin": {
-                "value": data_dict.get("pmin")["value"],
-                "unit": data_dict.get("pmin")["unit"],
-            },
-            "pmax": {
-                "value": data_dict.get("pmax")["value"],
-                "unit": data_dict.get("pmax")["unit"],
-            },
-            "spp": {
-                "value": data_dict.get("spp")["value"],
-                "unit": data_dict.get("spp")["unit"],
-            },
-            "pcat": {
-                "value": PCAT(data_dict.get("pcat")["value"]),
-                "unit": data_dict.get("pcat")["unit"],
-            },
-            "pmean": {
-                "value": data_dict.get("pmean")["value"],
-                "unit": data_dict.get("pmean")["unit"],
-            },
-            "pmedian": {
-                "value": data_dict.get("pmedian")["value"],
-                "unit": data_dict.get("pmedian")["unit"],
-            },
-            "Wsymb2": {
-                "value": WeatherSymbol.from_code(data_dict.get("Wsymb2")["value"]),
-                "unit": data_dict.get("Wsymb2")["unit"],
-            },
-        }
+    if not UNITS:
+        UNITS.update({item["name"]: item["unit"] for item in obj["parameters"]})
+    data_dict = {item["name"]: item["values"][0] for item in obj["parameters"]}
+    data_dict["pcat"] = PCAT.from_value(data_dict["pcat"])
+    data_dict["Wsymb2"] = WeatherSymbol.from_code(data_dict["Wsymb2"])
+    return valid_time, WeatherDataEntry(*[data_dict[name] for name in _PARAM_NAMES])
+
+
+_POOL_MAXSIZE = 10
+
+
+def _make_session() -> requests.Session:
+    session = requests.Session()
+    session.mount(
+        "https://", HTTPAdapter(pool_connections=4, pool_maxsize=_POOL_MAXSIZE)
     )
+    session.headers["Accept-Encoding"] = "gzip"
+    return session
 
 
 class SMHIHelper:
+    # Shared so repeated fetches reuse the pooled HTTPS connection. Only plain
+    # GETs go through it, which urllib3's connection pool handles thread-safely.
+    _session: ClassVar[requests.Session] = _make_session()
+
+    __slots__ = ("lon", "lat", "hourly_forecasts", "_url", "_sorted_ts", "_dates")
+
     def __init__(self, lon: float, lat: float) -> None:
         self.lon = lon
         self.lat = lat
+        self._url = f"https://opendata-download-metfcst.smhi.se/api/category/pmp3g/version/2/geotype/point/lon/{lon}/lat/{lat}/data.json"
         self.hourly_forecasts = {}
+        self._sorted_ts = None
+        self._dates = None
 
     def get_url(self) -> str:
-        return f"https://opendata-download-metfcst.smhi.se/api/category/pmp3g/version/2/geotype/point/lon/{self.lon}/lat/{self.lat}/data.json"
+        return self._url
 
     def fetch(self) -> None:
-        weather = json.loads(requests.get(self.get_url()).text)
-        for time_series in weather["timeSeries"]:
-            time, forecast = SMHI_timeSeries_object_to_WeatherDataEntry(time_series)
-            self.hourly_forecasts[time] = forecast
+        resp = self._session.get(self.get_url(), timeout=10)
+        resp.raise_for_status()
+        weather = json_loads(resp.content)
+        forecasts = [
+            SMHI_timeSeries_object_to_WeatherDataEntry(time_series)
+            for time_series in weather["timeSeries"]
+        ]
+        # Keep hourly_forecasts in chronological order so lookups never re-sort
+        forecasts.sort(key=lambda item: item[0])
+        self.hourly_forecasts = dict(forecasts)
+        self._sorted_ts = None
+        self._dates = None
 
     def get_timestamps(self):
-        return sorted(self.hourly_forecasts.keys())
+        if self._sorted_ts is None:
+            self._sorted_ts = list(self.hourly_forecasts)
+        # Copy so callers cannot alter the cached timestamps
+        return list(self._sorted_ts)
+
+    def _get_date_buckets(self):
+        if self._dates is None:
+            # hourly_forecasts is chronological, so each bucket is already sorted
+            buckets: dict[date, list[datetime]] = {}
+            for timestamp in self.hourly_forecasts:
+                buckets.setdefault(timestamp.date(), []).append(timestamp)
+            self._dates = buckets
+        return self._dates
 
     def get_dates(self):
-        return {
-            key: list(group)
-            for key, group in itertools.groupby(
-                self.get_timestamps(), key=lambda x: x.date()
-            )
-        }
+        # Copy so callers cannot alter the cached grouping
+        return {day: list(stamps) for day, stamps in self._get_date_buckets().items()}
 
     def get_current_weather(self) -> Tuple[datetime, WeatherDataEntry]:
-        time = min(self.get_timestamps())
+        if not self.hourly_forecasts:
+            raise ValueError("No forecasts fetched")
+        time = next(iter(self.hourly_forecasts))
         return time, self.hourly_forecasts[time]
 
     def get_hourly_forecasts_for_date(
@@ -236,10 +208,23 @@ class SMHIHelper:
     ) -> dict[datetime:WeatherDataEntry]:
         return {
             date_time: self.hourly_forecasts[date_time]
-            for date_time in self.get_dates()[date]
+            for date_time in self._get_date_buckets()[date]
         }
 
 
+def fetch_all(helpers: Iterable[SMHIHelper]) -> None:
+    """Fetch several locations concurrently over the shared connection pool.
+
+    At most _POOL_MAXSIZE workers run, one per pooled connection, so warm
+    connections are reused across calls.
+    """
+    helpers = list(helpers)
+    if not helpers:
+        return
+    with ThreadPoolExecutor(max_workers=min(len(helpers), _POOL_MAXSIZE)) as executor:
+        list(executor.map(SMHIHelper.fetch, helpers))
+
+
 def get_weather():
     weather = SMHIHelper(15.580572, 58.381857)
     weather.fetch()